@@ -1,9 +1,111 @@
-from pdf2image import convert_from_path, convert_from_bytes
+from pdf2image import convert_from_path, convert_from_bytes, pdfinfo_from_path
 from PIL import Image
 import os
 import io
+import logging
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from logging_config import configure_logging
 
-def convert_pdf_to_images(pdf_path, output_dir="pdf_images", dpi=300, format="PNG"):
+log = logging.getLogger(__name__)
+
+# zlib level for PNG output: fastest setting, files are only slightly larger than the default (6)
+PNG_COMPRESS_LEVEL = 1
+
+# Threads encoding pages. Every page in flight is a decoded full-resolution raster
+# (about 25 MB for an A4 page at 300 DPI RGB), so parallelism is traded for memory:
+# at most SAVE_QUEUE_DEPTH pages are held at once, however long the document is.
+SAVE_WORKERS = min(os.cpu_count() or 1, 4)
+
+# Page saves kept in flight before the oldest one is waited on and handed to the caller
+SAVE_QUEUE_DEPTH = 2 * SAVE_WORKERS
+
+def _save_image(image, filepath, format):
+    """
+    Save a page image, using fast compression for PNG output
+    """
+    if format.upper() == 'PNG':
+        image.save(filepath, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+    elif format.upper() == 'PPM' and image.mode != 'RGB':
+        # Pillow writes grayscale images as PGM data, which doesn't belong in a .ppm file
+        image.convert('RGB').save(filepath, format='PPM')
+    else:
+        image.save(filepath, format=format.upper())
+
+def _save_page_file(page_path, filepath, format):
+    """
+    Save a page rendered by poppler to filepath, removing the rendered file
+    """
+    if os.path.splitext(page_path)[1][1:].lower() == format.lower():
+        # Already in the requested format, no need to re-encode
+        # (grayscale renders come out as .pgm, so they never take this path for PPM)
+        shutil.move(page_path, filepath)
+    else:
+        with Image.open(page_path) as image:
+            _save_image(image, filepath, format)
+        os.unlink(page_path)
+
+def _finish_save(page_num, filepath, save):
+    """
+    Wait for a submitted page save and report it
+    """
+    save.result()
+    log.info("Saved page %d: %s", page_num, filepath)
+    return filepath
+
+def _save_pages(pages, output_dir, format, save_page=_save_image):
+    """
+    Save (page_number, image) pairs as page_<n>.<format> files in output_dir.
+    
+    Pillow releases the GIL while encoding, so pages are saved on a thread pool
+    to compress in parallel and overlap with the file writes. At most
+    SAVE_QUEUE_DEPTH saves (and so decoded pages) are in flight, which bounds
+    memory, and each path is yielded as soon as its page is written.
+    
+    Yields:
+        str: Path of each saved image file, in page order
+    """
+    with ThreadPoolExecutor(SAVE_WORKERS) as pool:
+        pending = deque()
+        for page_num, image in pages:
+            filename = f"page_{page_num}.{format.lower()}"
+            filepath = os.path.join(output_dir, filename)
+            pending.append((page_num, filepath, pool.submit(save_page, image, filepath, format)))
+            if len(pending) >= SAVE_QUEUE_DEPTH:
+                yield _finish_save(*pending.popleft())
+        
+        while pending:
+            yield _finish_save(*pending.popleft())
+
+def convert_pdf_to_images_iter(pdf_path, output_dir="pdf_images", dpi=300, format="PNG", grayscale=False):
+    """
+    Convert PDF pages to images, yielding each image path as soon as it is saved.
+    
+    Takes the same arguments as convert_pdf_to_images; errors are raised to the caller.
+    
+    Yields:
+        str: Path of each saved image file, in page order
+    """
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Let poppler write each page to disk instead of keeping every page in memory
+        page_paths = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            grayscale=grayscale,
+            output_folder=temp_dir,
+            paths_only=True,
+            fmt='ppm'
+        )
+        
+        # Save each page as an image
+        yield from _save_pages(enumerate(page_paths, start=1), output_dir, format, save_page=_save_page_file)
+
+def convert_pdf_to_images(pdf_path, output_dir="pdf_images", dpi=300, format="PNG", grayscale=False):
     """
     Convert PDF pages to images using pdf2image library.
     
@@ -12,33 +114,69 @@ def convert_pdf_to_images(pdf_path, output_dir="pdf_images", dpi=300, format="PN
         output_dir (str): Directory to save converted images
         dpi (int): Resolution of output images (higher = better quality)
         format (str): Output image format (PNG, JPEG, TIFF, etc.)
+        grayscale (bool): Render pages in 8-bit grayscale instead of RGB
     
     Returns:
         list: List of saved image file paths
     """
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-    
     try:
-        # Convert PDF to images
-        images = convert_from_path(pdf_path, dpi=dpi)
-        image_paths = []
-        
-        # Save each page as an image
-        for i, image in enumerate(images):
-            filename = f"page_{i + 1}.{format.lower()}"
-            filepath = os.path.join(output_dir, filename)
-            image.save(filepath, format=format.upper())
-            image_paths.append(filepath)
-            print(f"Saved page {i + 1}: {filepath}")
-        
-        return image_paths
+        return list(convert_pdf_to_images_iter(pdf_path, output_dir, dpi, format, grayscale))
         
     except Exception as e:
-        print(f"Error converting PDF to images: {e}")
+        log.error("Error converting PDF to images: %s", e)
         return []
 
-def convert_pdf_bytes_to_images(pdf_bytes, output_dir="pdf_images", dpi=300, format="PNG"):
+def _convert_bytes_via_memfd(pdf_bytes, **kwargs):
+    """
+    Convert PDF bytes to images by handing poppler an anonymous in-memory file,
+    instead of letting pdf2image copy the bytes to a temporary file on disk.
+    
+    Returns None when that is not possible (no memfd_create, the syscall is
+    blocked, or /proc is not mounted), so the caller can fall back.
+    """
+    if not hasattr(os, 'memfd_create'):
+        return None
+    
+    try:
+        fd = os.memfd_create('pdf_input')
+    except OSError:
+        return None
+    
+    try:
+        with open(fd, 'wb', closefd=False) as f:
+            f.write(pdf_bytes)
+        
+        # The fd is close-on-exec, so poppler opens it through this process's /proc entry
+        path = f"/proc/{os.getpid()}/fd/{fd}"
+        if not os.path.exists(path):
+            return None
+        return convert_from_path(path, **kwargs)
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
+
+def convert_pdf_bytes_to_images_iter(pdf_bytes, output_dir="pdf_images", dpi=300, format="PNG", grayscale=False):
+    """
+    Convert PDF from bytes to images, yielding each image path as soon as it is saved.
+    
+    Takes the same arguments as convert_pdf_bytes_to_images; errors are raised to the caller.
+    
+    Yields:
+        str: Path of each saved image file, in page order
+    """
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Convert PDF bytes to images
+    images = _convert_bytes_via_memfd(pdf_bytes, dpi=dpi, grayscale=grayscale)
+    if images is None:
+        images = convert_from_bytes(pdf_bytes, dpi=dpi, grayscale=grayscale)
+    
+    # Save each page as an image
+    yield from _save_pages(enumerate(images, start=1), output_dir, format)
+
+def convert_pdf_bytes_to_images(pdf_bytes, output_dir="pdf_images", dpi=300, format="PNG", grayscale=False):
     """
     Convert PDF from bytes to images.
     
@@ -47,33 +185,51 @@ def convert_pdf_bytes_to_images(pdf_bytes, output_dir="pdf_images", dpi=300, for
         output_dir (str): Directory to save converted images
         dpi (int): Resolution of output images
         format (str): Output image format
+        grayscale (bool): Render pages in 8-bit grayscale instead of RGB
     
     Returns:
         list: List of saved image file paths
     """
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-    
     try:
-        # Convert PDF bytes to images
-        images = convert_from_bytes(pdf_bytes, dpi=dpi)
-        image_paths = []
-        
-        # Save each page as an image
-        for i, image in enumerate(images):
-            filename = f"page_{i + 1}.{format.lower()}"
-            filepath = os.path.join(output_dir, filename)
-            image.save(filepath, format=format.upper())
-            image_paths.append(filepath)
-            print(f"Saved page {i + 1}: {filepath}")
-        
-        return image_paths
+        return list(convert_pdf_bytes_to_images_iter(pdf_bytes, output_dir, dpi, format, grayscale))
         
     except Exception as e:
-        print(f"Error converting PDF bytes to images: {e}")
+        log.error("Error converting PDF bytes to images: %s", e)
         return []
 
-def convert_specific_pages(pdf_path, pages, output_dir="pdf_images", dpi=300, format="PNG"):
+def convert_specific_pages_iter(pdf_path, pages, output_dir="pdf_images", dpi=300, format="PNG", grayscale=False):
+    """
+    Convert specific pages of PDF to images, yielding each image path as soon as it is saved.
+    
+    Takes the same arguments as convert_specific_pages; errors are raised to the caller.
+    
+    Yields:
+        str: Path of each saved image file, in page order
+    """
+    # Create output directory if it doesn't exist
+    os.makedirs(output_dir, exist_ok=True)
+    
+    page_numbers = sorted(set(pages))
+    first_page, last_page = page_numbers[0], page_numbers[-1]
+    
+    # Note: pdf2image uses 1-indexed pages, but first_page and last_page are inclusive
+    if len(page_numbers) * 2 >= last_page - first_page + 1:
+        # Dense selection: one render of the whole range wastes little
+        images = convert_from_path(pdf_path, dpi=dpi, first_page=first_page, last_page=last_page, grayscale=grayscale)
+        selected = [(page_num, images[page_num - first_page]) for page_num in page_numbers
+                    if page_num - first_page < len(images)]
+    else:
+        # Sparse selection: render only the requested pages, one at a time
+        selected = (
+            (page_num, image)
+            for page_num in page_numbers
+            for image in convert_from_path(pdf_path, dpi=dpi, first_page=page_num, last_page=page_num, grayscale=grayscale)
+        )
+    
+    # Save only requested pages
+    yield from _save_pages(selected, output_dir, format)
+
+def convert_specific_pages(pdf_path, pages, output_dir="pdf_images", dpi=300, format="PNG", grayscale=False):
     """
     Convert specific pages of PDF to images.
     
@@ -83,52 +239,26 @@ def convert_specific_pages(pdf_path, pages, output_dir="pdf_images", dpi=300, fo
         output_dir (str): Directory to save converted images
         dpi (int): Resolution of output images
         format (str): Output image format
+        grayscale (bool): Render pages in 8-bit grayscale instead of RGB
     
     Returns:
         list: List of saved image file paths
     """
-    # Create output directory if it doesn't exist
-    os.makedirs(output_dir, exist_ok=True)
-    
     try:
-        # Convert specific pages to images
-        # Note: pdf2image uses 1-indexed pages, but first_page and last_page are inclusive
-        images = convert_from_path(pdf_path, dpi=dpi, first_page=min(pages), last_page=max(pages))
-        image_paths = []
-        
-        # Filter and save only requested pages
-        for i, page_num in enumerate(sorted(pages)):
-            if i < len(images):
-                image = images[page_num - min(pages)]
-                filename = f"page_{page_num}.{format.lower()}"
-                filepath = os.path.join(output_dir, filename)
-                image.save(filepath, format=format.upper())
-                image_paths.append(filepath)
-                print(f"Saved page {page_num}: {filepath}")
-        
-        return image_paths
+        return list(convert_specific_pages_iter(pdf_path, pages, output_dir, dpi, format, grayscale))
         
     except Exception as e:
-        print(f"Error converting specific pages: {e}")
+        log.error("Error converting specific pages: %s", e)
         return []
 
-def convert_with_custom_settings(pdf_path, output_dir="pdf_images", **kwargs):
+def convert_with_custom_settings_iter(pdf_path, output_dir="pdf_images", **kwargs):
     """
-    Convert PDF to images with custom settings.
+    Convert PDF to images with custom settings, yielding each image path as soon as it is saved.
     
-    Args:
-        pdf_path (str): Path to the PDF file
-        output_dir (str): Directory to save converted images
-        **kwargs: Additional arguments for pdf2image
-            - dpi (int): Resolution (default: 200)
-            - format (str): Output format (default: 'PNG')
-            - thread_count (int): Number of threads to use
-            - userpw (str): PDF password if needed
-            - use_cropbox (bool): Use crop box instead of media box
-            - strict (bool): Enable strict mode
+    Takes the same arguments as convert_with_custom_settings; errors are raised to the caller.
     
-    Returns:
-        list: List of saved image file paths
+    Yields:
+        str: Path of each saved image file, in page order
     """
     # Default settings
     settings = {
@@ -146,23 +276,36 @@ def convert_with_custom_settings(pdf_path, output_dir="pdf_images", **kwargs):
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
+    # Convert PDF to images with custom settings
+    images = convert_from_path(pdf_path, **settings)
+    
+    # Save each page as an image
+    yield from _save_pages(enumerate(images, start=1), output_dir, output_format)
+
+def convert_with_custom_settings(pdf_path, output_dir="pdf_images", **kwargs):
+    """
+    Convert PDF to images with custom settings.
+    
+    Args:
+        pdf_path (str): Path to the PDF file
+        output_dir (str): Directory to save converted images
+        **kwargs: Additional arguments for pdf2image
+            - dpi (int): Resolution (default: 200)
+            - format (str): Output format (default: 'PNG')
+            - thread_count (int): Number of threads to use
+            - userpw (str): PDF password if needed
+            - use_cropbox (bool): Use crop box instead of media box
+            - strict (bool): Enable strict mode
+            - grayscale (bool): Render pages in 8-bit grayscale instead of RGB
+    
+    Returns:
+        list: List of saved image file paths
+    """
     try:
-        # Convert PDF to images with custom settings
-        images = convert_from_path(pdf_path, **settings)
-        image_paths = []
-        
-        # Save each page as an image
-        for i, image in enumerate(images):
-            filename = f"page_{i + 1}.{output_format.lower()}"
-            filepath = os.path.join(output_dir, filename)
-            image.save(filepath, format=output_format.upper())
-            image_paths.append(filepath)
-            print(f"Saved page {i + 1}: {filepath}")
-        
-        return image_paths
+        return list(convert_with_custom_settings_iter(pdf_path, output_dir, **kwargs))
         
     except Exception as e:
-        print(f"Error converting with custom settings: {e}")
+        log.error("Error converting with custom settings: %s", e)
         return []
 
 def get_pdf_info(pdf_path):
@@ -176,37 +319,39 @@ def get_pdf_info(pdf_path):
         dict: Dictionary with PDF information
     """
     try:
-        # Convert just to get page count (low DPI for speed)
-        images = convert_from_path(pdf_path, dpi=50)
+        # Read the page count from the document metadata instead of rendering every page
+        page_count = pdfinfo_from_path(pdf_path)['Pages']
         
         info = {
-            'page_count': len(images),
+            'page_count': page_count,
             'file_size_mb': os.path.getsize(pdf_path) / (1024 * 1024),
             'filename': os.path.basename(pdf_path)
         }
         
-        # Get dimensions of first page
-        if images:
-            first_page = images[0]
+        # Get dimensions of first page (low DPI for speed)
+        if page_count:
+            first_page = convert_from_path(pdf_path, dpi=50, first_page=1, last_page=1)[0]
             info['page_dimensions'] = first_page.size
             info['page_mode'] = first_page.mode
         
         return info
         
     except Exception as e:
-        print(f"Error getting PDF info: {e}")
+        log.error("Error getting PDF info: %s", e)
         return {}
 
 # Example usage
 if __name__ == "__main__":
+    configure_logging()
+    
     # Example PDF file path
     pdf_file = "files/1.pdf"  # Replace with your PDF file path
     
     try:
         # Basic conversion
-        print("Converting PDF to images...")
+        log.info("Converting PDF to images...")
         image_files = convert_pdf_to_images(pdf_file, dpi=300, format="PNG")
-        print(f"Converted {len(image_files)} pages to images")
+        log.info("Converted %d pages to images", len(image_files))
         
         # Get PDF info
         # print("\nGetting PDF information...")
@@ -238,6 +383,6 @@ if __name__ == "__main__":
         # )
         
     except Exception as e:
-        print(f"Error: {e}")
-        print("Make sure you have pdf2image installed: pip install pdf2image")
-        print("Also ensure poppler is installed on your system:")
\ No newline at end of file
+        log.error("Error: %s", e)
+        log.error("Make sure you have pdf2image installed: pip install pdf2image")
+        log.error("Also ensure poppler is installed on your system:")
\ No newline at end of file
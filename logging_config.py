@@ -0,0 +1,19 @@
+import logging
+import logging.handlers
+import sys
+
+# Number of log records buffered before they are written to stdout
+LOG_BATCH_SIZE = 100
+
+def configure_logging():
+    """
+    Send log records to stdout in batches instead of one write per message
+    
+    Also used as a process pool initializer: forked workers inherit the parent's handler,
+    so basicConfig leaves it alone, while spawned workers start without one.
+    """
+    handler = logging.handlers.MemoryHandler(
+        capacity=LOG_BATCH_SIZE,
+        target=logging.StreamHandler(sys.stdout)
+    )
+    logging.basicConfig(level=logging.INFO, format='%(message)s', handlers=[handler])
@@ -1,67 +1,166 @@
+import logging
+import math
 import os
+import tempfile
+import pymupdf
 import pytesseract
-from PIL import Image
-from pdf2image import convert_from_path
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import repeat
+from PIL import Image, TiffImagePlugin
+from logging_config import configure_logging
 
-def extract_text_from_pdf(pdf_path):
+log = logging.getLogger(__name__)
+
+# Resolution pages are rendered at for OCR
+OCR_DPI = 200
+
+# Write buffer for extracted text files
+OUTPUT_BUFFER_SIZE = 1024 * 1024
+
+# Lookup table for the binarization threshold: built once so Pillow applies it
+# in C instead of calling a Python function for every entry on every page
+_THRESHOLD_LUT = [0] * 128 + [255] * 128
+
+def _chunk(items, size):
+    """
+    Split a list into consecutive chunks of at most `size` items
     """
-    Extract text from a scanned Bangla PDF using OCR
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def _render_page(doc, page_number, binarize=False):
+    """
+    Render one page in-process straight to an 8-bit grayscale image
+    """
+    pix = doc[page_number].get_pixmap(dpi=OCR_DPI, colorspace=pymupdf.csGRAY)
+    image = Image.frombuffer('L', (pix.width, pix.height), pix.samples, 'raw', 'L', 0, 1)
+    
+    # Tesseract binarizes with Otsu itself; a fixed threshold is only applied on request
+    if binarize:
+        image = image.point(_THRESHOLD_LUT)
+    return image
+
+def _ocr_batch(pdf_path, page_numbers, binarize=False):
+    """
+    Render and OCR a batch of pages with a single tesseract run over a multi-page TIFF
+    (top-level so it can run in a worker process)
+    
+    Returns a list with the text of each page, in the same order as page_numbers.
+    """
+    with tempfile.TemporaryDirectory() as batch_dir, pymupdf.open(pdf_path) as doc:
+        # Pack the batch into one TIFF so tesseract loads the Bangla model once for all pages.
+        # Frames are appended one at a time (save_all would first collect every page in a list),
+        # so only one rendered page is in memory at once.
+        tiff_path = os.path.join(batch_dir, 'pages.tiff')
+        with TiffImagePlugin.AppendingTiffWriter(tiff_path, new=True) as tiff:
+            for page_number in page_numbers:
+                _render_page(doc, page_number, binarize).save(tiff, format='TIFF', compression='tiff_lzw')
+                tiff.newFrame()
+        
+        # Tesseract ends every page with a form feed; anything else would shift the page numbers
+        text = pytesseract.image_to_string(tiff_path, lang='ben')
+        texts = text.split('\f')
+        if len(texts) - 1 != len(page_numbers):
+            raise RuntimeError(
+                f"Tesseract returned {len(texts) - 1} pages for a batch of {len(page_numbers)}"
+            )
+        return texts[:-1]
+
+def extract_text_from_pdf(pdf_path, out_fh, binarize=False, max_workers=None):
+    """
+    Extract text from a scanned Bangla PDF using OCR, writing each page to out_fh
+    as soon as it is recognized
+    
+    Pages are passed to Tesseract in grayscale; set binarize=True to apply the
+    legacy fixed threshold first. Pages are spread over max_workers processes
+    (default: one per core); with max_workers=1 everything runs in the calling process.
     """
     try:
-        # Convert PDF pages to images
-        images = convert_from_path(pdf_path)
+        with pymupdf.open(pdf_path) as doc:
+            page_count = doc.page_count
         
-        # Process each page
-        all_text = []
-        for i, image in enumerate(images):
-            print(f"Processing page {i+1}...")
-            
-            # Convert image to grayscale
-            image = image.convert('L')
-            
-            # Apply threshold to improve OCR accuracy
-            image = image.point(lambda x: 0 if x < 128 else 255, '1')
-            
-            # Extract text using Tesseract
-            text = pytesseract.image_to_string(image, lang='ben')
-            all_text.append(f"Page {i+1}:\n{text}\n\n")
-            
-        return ''.join(all_text)
+        # Split the pages into one batch per worker so each worker starts tesseract only once
+        workers = max_workers or os.cpu_count() or 1
+        batches = _chunk(list(range(page_count)), max(1, math.ceil(page_count / workers)))
+        
+        # Never start more processes than there are batches; a single batch runs in this process
+        workers = min(workers, len(batches))
+        
+        # Render and OCR the batches across the workers; map() keeps results in page order
+        _flush_logs()
+        with ProcessPoolExecutor(workers) if workers > 1 else nullcontext() as executor:
+            batch_map = executor.map if executor else map
+            page_num = 0
+            for texts in batch_map(_ocr_batch, repeat(pdf_path), batches, repeat(binarize)):
+                for text in texts:
+                    page_num += 1
+                    log.info("Processed page %d...", page_num)
+                    out_fh.write(f"Page {page_num}:\n{text}\n\n")
     except Exception as e:
-        print(f"Error: {str(e)}")
-        return ""
+        log.error("Error: %s", e)
+
+def _extract_to_file(pdf_path, output_path, max_workers=None):
+    """
+    Extract text from a PDF straight into output_path (top-level so it can run in a worker process)
+    """
+    try:
+        # A large buffer coalesces the per-page writes into few physical writes
+        with open(output_path, 'w', encoding='utf-8', buffering=OUTPUT_BUFFER_SIZE) as f:
+            extract_text_from_pdf(pdf_path, f, max_workers=max_workers)
+        return output_path
+    finally:
+        # Worker processes exit without running logging's shutdown hook, so flush buffered records here
+        _flush_logs()
+
+def _flush_logs():
+    """
+    Write out buffered log records; called before forking so workers don't inherit
+    (and later print again) records the parent has not written yet
+    """
+    for handler in logging.getLogger().handlers:
+        handler.flush()
 
 def main():
+    configure_logging()
+    
     # Get all PDF files in the files directory
     files_dir = 'files'
     if not os.path.exists(files_dir):
-        print(f"Directory '{files_dir}' not found!")
+        log.error("Directory '%s' not found!", files_dir)
         return
         
     # Get all PDF files
     pdf_files = [f for f in os.listdir(files_dir) if f.lower().endswith('.pdf')]
     
     if not pdf_files:
-        print("No PDF files found in the directory!")
+        log.error("No PDF files found in the directory!")
         return
         
-    # Process each PDF file
-    for pdf_file in pdf_files:
-        pdf_path = os.path.join(files_dir, pdf_file)
-        print(f"\nProcessing file: {pdf_file}")
-        
-        # Extract text
-        print("Extracting text from PDF...")
-        extracted_text = extract_text_from_pdf(pdf_path)
-        
-        # Save to output file
-        output_path ="extracted_text/" + os.path.splitext(pdf_file)[0] + '_extracted.txt'
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(extracted_text)
-            
-        print(f"Text extracted and saved to: {output_path}")
+    # Create the output directory once, up front
+    output_dir = 'extracted_text'
+    os.makedirs(output_dir, exist_ok=True)
+    
+    pdf_paths = [os.path.join(files_dir, f) for f in pdf_files]
+    output_paths = [os.path.join(output_dir, os.path.splitext(f)[0] + '_extracted.txt') for f in pdf_files]
+    
+    # Split the cores between files and the pages within each file, so a few large
+    # PDFs still keep every core busy
+    cpu_count = os.cpu_count() or 1
+    file_workers = min(len(pdf_paths), cpu_count)
+    page_workers = max(1, cpu_count // len(pdf_paths))
+    
+    if len(pdf_paths) > 1:
+        log.info("\nExtracting text from %d PDF files...", len(pdf_paths))
+    else:
+        log.info("\nExtracting text from PDF: %s", pdf_files[0])
+    
+    _flush_logs()
+    with ProcessPoolExecutor(file_workers, initializer=configure_logging) if file_workers > 1 else nullcontext() as executor:
+        file_map = executor.map if executor else map
+        for output_path in file_map(_extract_to_file, pdf_paths, output_paths, repeat(page_workers)):
+            log.info("Text extracted and saved to: %s", output_path)
     
-    print("All files processed.")
+    log.info("All files processed.")
 
 if __name__ == "__main__":
     main()